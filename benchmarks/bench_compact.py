@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+copyright (c) 2016 Earth Advantage. All rights reserved.
+..codeauthor::Paul Munday <paul@paulmunday.net>
+
+Benchmark memory use and lookup latency of compact configs against the
+plain dict tree produced by yaml.load.
+
+Each mode is loaded in fresh processes so resident memory is comparable.
+Resident memory (and lookup latency) is measured in one process and the
+memory still allocated once loading has finished (retained) in another,
+under tracemalloc, as tracemalloc's own bookkeeping inflates resident
+memory. Resident memory includes what the YAML parser used (and the
+allocator kept).
+
+usage: python benchmarks/bench_compact.py [records]
+"""
+
+# Imports from Standard Library
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+# Local Imports
+from yamlconf import Config  # noqa pylint: disable=wrong-import-position
+
+LOOKUPS = 100000
+
+
+class BenchConfig(Config):
+    """Config class for benchmark"""
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, config_dir, compact):
+        os.environ['BENCH_CONFIG_PATH'] = config_dir
+        super(BenchConfig, self).__init__(
+            env_prefix='BENCH_CONFIG', compact=compact
+        )
+
+
+def rss():
+    """Current resident memory in bytes."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (IOError, OSError):
+        # peak rather than current, but close enough after loading
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def write_config(path, records):
+    """Write generated config with records records."""
+    with open(path, 'w') as conf:
+        conf.write("config_prefix: BENCH\nrecords:\n")
+        for num in range(records):
+            conf.write(
+                "    record{num}:\n"
+                "        id: {num}\n"
+                "        status: active\n"
+                "        region: region{region}\n"
+                "        owner: team{team}\n"
+                "        weight: {weight}\n"
+                "        readings: [{readings}]\n".format(
+                    num=num, region=num % 10, team=num % 50,
+                    weight=num / 3.0,
+                    readings=', '.join(str(num + i) for i in range(32))
+                )
+            )
+
+
+def measure_retained(config_dir, compact):
+    """Load config and report memory still allocated afterwards."""
+    tracemalloc.start()
+    conf = BenchConfig(config_dir, compact)
+    print(tracemalloc.get_traced_memory()[0])
+    return conf
+
+
+def measure(config_dir, compact, retained):
+    """Load config and report memory and lookup latency."""
+    before = rss()
+    conf = BenchConfig(config_dir, compact)
+    resident = rss() - before
+    records = conf.get('records')
+    keys = ['record{}'.format(num) for num in range(0, len(records), 97)]
+
+    def lookup():
+        """Look up values."""
+        for key in keys:
+            record = records.get(key)
+            record.get('owner')
+            record['readings'][5]  # pylint: disable=pointless-statement
+
+    number = max(1, LOOKUPS // (len(keys) * 2))
+    best = min(timeit.repeat(lookup, number=number, repeat=3))
+    print("{:8} {:12.1f} {:12.1f} {:12.0f}".format(
+        'compact' if compact else 'plain', resident / 1048576.0,
+        int(retained) / 1048576.0, best / (number * len(keys) * 2) * 1e9
+    ))
+
+
+def main(records=5000):
+    """Run benchmark."""
+    config_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(config_dir, 'config.yaml')
+        write_config(path, records)
+        print("{} records, {:.1f} MB of YAML".format(
+            records, os.path.getsize(path) / 1048576.0
+        ))
+        print("{:8} {:>12} {:>12} {:>12}".format(
+            '', 'resident MB', 'retained MB', 'ns/lookup'
+        ))
+        for compact in ('', '1'):
+            retained = subprocess.check_output([
+                sys.executable, __file__, '--retained', config_dir, compact
+            ]).decode('ascii').strip()
+            subprocess.check_call([
+                sys.executable, __file__, '--measure', config_dir, compact,
+                retained
+            ])
+    finally:
+        shutil.rmtree(config_dir)
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--retained']:
+        measure_retained(sys.argv[2], bool(sys.argv[3]))
+    elif sys.argv[1:2] == ['--measure']:
+        measure(sys.argv[2], bool(sys.argv[3]), sys.argv[4])
+    else:
+        main(*[int(arg) for arg in sys.argv[1:2]])
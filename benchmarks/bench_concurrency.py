@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+copyright (c) 2016 Earth Advantage. All rights reserved.
+..codeauthor::Paul Munday <paul@paulmunday.net>
+
+Benchmark reader throughput while Config is reloaded.
+
+Compares lock free reads with no reloads and with a reload every 10ms
+against reads and reloads serialized by one lock, with the same reloads.
+Reloading parses YAML, which holds the GIL, so it costs readers some
+throughput even when they never wait for it.
+
+usage: python benchmarks/bench_concurrency.py [readers]
+"""
+
+# Imports from Standard Library
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+# Local Imports
+from yamlconf import Config  # noqa pylint: disable=wrong-import-position
+
+DURATION = 2.0
+
+
+class BenchConfig(Config):
+    """Config class for benchmark"""
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, config_dir):
+        os.environ['BENCH_CONFIG_PATH'] = config_dir
+        super(BenchConfig, self).__init__(env_prefix='BENCH_CONFIG')
+
+
+def run(conf, readers, reload_interval=None, lock=None):
+    """Return reads per second across readers."""
+    stop = threading.Event()
+    counts = []
+
+    def read():
+        """Read until stopped."""
+        count = 0
+        while not stop.is_set():
+            if lock:
+                with lock:
+                    conf.get('key', section='section')
+            else:
+                conf.get('key', section='section')
+            count += 1
+        counts.append(count)
+
+    def reload():
+        """Reload until stopped."""
+        while not stop.wait(reload_interval):
+            if lock:
+                with lock:
+                    conf.load()
+            else:
+                conf.load()
+
+    threads = [threading.Thread(target=read) for _ in range(readers)]
+    if reload_interval:
+        threads.append(threading.Thread(target=reload))
+    for thread in threads:
+        thread.start()
+    time.sleep(DURATION)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / DURATION
+
+
+def main(readers=8):
+    """Run benchmark."""
+    config_dir = tempfile.mkdtemp()
+    try:
+        with open(os.path.join(config_dir, 'config.yaml'), 'w') as conf:
+            conf.write("config_prefix: BENCH\nsection:\n    key: value\n")
+            conf.write("\n".join(
+                "key{}: {}".format(num, num) for num in range(1000)
+            ))
+        conf = BenchConfig(config_dir)
+        print("{} readers, {}s each".format(readers, DURATION))
+        for name, kwargs in [
+                ('lock free, no reloads', {}),
+                ('lock free, reload every 10ms', {'reload_interval': 0.01}),
+                ('locked, reload every 10ms',
+                 {'reload_interval': 0.01, 'lock': threading.Lock()}),
+        ]:
+            print("{:30} {:12,.0f} reads/s".format(
+                name, run(conf, readers, **kwargs)
+            ))
+    finally:
+        shutil.rmtree(config_dir)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+copyright (c) 2016 Earth Advantage. All rights reserved.
+..codeauthor::Paul Munday <paul@paulmunday.net>
+
+Benchmark compiled schema validation against a naive recursive validator
+that interprets the schema spec on every call.
+
+usage: python benchmarks/bench_schema.py [sections]
+"""
+
+# Imports from Standard Library
+import os
+import sys
+import timeit
+
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+# Local Imports
+from yamlconf.schema import (  # noqa pylint: disable=wrong-import-position
+    MISSING,
+    Field,
+    Schema,
+)
+
+
+def naive_validate(spec, config, path='', errors=None):
+    """Walk config and spec together, checking each value."""
+    errors = [] if errors is None else errors
+    for key, child in spec.items():
+        key_path = "{}.{}".format(path, key) if path else key
+        value = config.get(key, MISSING) if isinstance(config, dict) else (
+            MISSING
+        )
+        if isinstance(child, dict):
+            naive_validate(child, value if value is not MISSING else {},
+                           key_path, errors)
+            continue
+        if not isinstance(child, Field):
+            child = Field(child)
+        if value is MISSING or value is None:
+            if child.required:
+                errors.append("{}: required value is missing".format(
+                    key_path
+                ))
+            continue
+        if child.types and not isinstance(value, child.types):
+            errors.append("{}: wrong type".format(key_path))
+        elif child.min_value is not None and value < child.min_value:
+            errors.append("{}: too small".format(key_path))
+        elif child.max_value is not None and value > child.max_value:
+            errors.append("{}: too large".format(key_path))
+        elif child.choices is not None and value not in child.choices:
+            errors.append("{}: invalid choice".format(key_path))
+    return errors
+
+
+def build(sections):
+    """Build schema spec and matching config with sections sections."""
+    spec = {}
+    config = {}
+    for num in range(sections):
+        name = 'section{}'.format(num)
+        spec[name] = {
+            'host': str,
+            'port': Field(int, min_value=1, max_value=65535),
+            'engine': Field(str, required=False, choices=('pg', 'sqlite')),
+            'options': {
+                'timeout': Field(float, required=False, min_value=0),
+                'retries': Field(int, required=False, min_value=0),
+            },
+        }
+        config[name] = {
+            'host': 'localhost', 'port': 5432 + num, 'engine': 'pg',
+            'options': {'timeout': 1.5, 'retries': 3},
+        }
+    return spec, config
+
+
+def main(sections=1000, number=20):
+    """Run benchmark."""
+    spec, config = build(sections)
+    schema = Schema(spec)
+    env_names = schema.env_names(
+        lambda var, section: 'BENCH_SCHEMA_{}_{}'.format(section, var)
+    )
+    results = [
+        ('naive', lambda: naive_validate(spec, config)),
+        ('compiled', lambda: schema.validate(config, env_names)),
+        # Config keeps the parsed config if the source is unchanged and
+        # only validates it again if environment overrides have changed
+        ('compiled (reload, source unchanged)',
+         lambda: schema.environment(env_names)),
+    ]
+    print("{} sections, best of 3 x {} runs".format(sections, number))
+    for name, func in results:
+        best = min(timeit.repeat(func, number=number, repeat=3)) / number
+        print("{:40} {:8.3f} ms".format(name, best * 1000))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -9,3 +9,5 @@ All rights reserved
 # Local Imports
 from yamlconf.config import Config
 from yamlconf.exceptions import ConfigError
+from yamlconf.schema import Field, Schema
+from yamlconf.sources import HTTPSource, Source
@@ -0,0 +1,366 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+copyright (c) 2016 Earth Advantage. All rights reserved.
+..codeauthor::Paul Munday <paul@paulmunday.net>
+
+Compact, read only representation of parsed config.
+
+Used by Config(compact=True) for very large configs:
+
+* keys are interned and equal strings are stored once.
+* mappings with the same keys (in the same order) share a single key
+  index, each only storing a tuple of its values.
+* long lists of ints or floats are stored in an array, other lists in a
+  tuple.
+
+Mappings and lists are read only, supporting the usual dict and list
+methods (get, keys, items, values etc. though not e.g. append). They
+compare equal to the dicts and lists they were made from. Use thaw() to
+get a plain, mutable copy.
+
+compact_loader() returns a loader that builds compact config while
+parsing, so peak memory is not that of the plain config plus the compact
+one. compact() converts config that has already been parsed.
+"""
+
+# Imports from Standard Library
+import sys
+from array import array
+
+# Imports from Third Party Modules
+import yaml
+
+try:
+    from collections.abc import ItemsView, Mapping, Sequence, ValuesView
+except ImportError:     # Python 2
+    from collections import (  # noqa
+        ItemsView,
+        Mapping,
+        Sequence,
+        ValuesView,
+    )
+
+# Constants
+# lists shorter than this are not worth converting to arrays
+MIN_ARRAY_LENGTH = 16
+try:
+    array('q')
+    INT_TYPECODE = 'q'
+except ValueError:      # Python 2
+    INT_TYPECODE = 'l'
+MAP_TAG = 'tag:yaml.org,2002:map'
+MERGE_TAG = 'tag:yaml.org,2002:merge'
+SEQ_TAG = 'tag:yaml.org,2002:seq'
+STR_TAG = 'tag:yaml.org,2002:str'
+# compact subclasses of loaders, see compact_loader
+COMPACT_LOADERS = {}
+try:
+    INTERN = sys.intern
+except AttributeError:  # Python 2
+    INTERN = intern     # noqa pylint: disable=undefined-variable
+
+
+# Helper Functions & Classes
+class _CompactItemsView(ItemsView):
+    """Items of a CompactMapping."""
+    # pylint: disable=too-few-public-methods
+    __slots__ = ()
+
+    def __iter__(self):
+        # pylint: disable=protected-access
+        return iter(zip(self._mapping._index, self._mapping._values))
+
+
+class _CompactValuesView(ValuesView):
+    """Values of a CompactMapping."""
+    # pylint: disable=too-few-public-methods
+    __slots__ = ()
+
+    def __iter__(self):
+        # pylint: disable=protected-access
+        return iter(self._mapping._values)
+
+
+def _sequence_eq(sequence, other):
+    """Compare read only list with a list (or other sequence)."""
+    if isinstance(other, (list, tuple, ScalarList)):
+        return len(sequence) == len(other) and all(
+            mine == theirs for mine, theirs in zip(sequence, other)
+        )
+    return NotImplemented
+
+
+def _sequence_ne(sequence, other):
+    """Negation of _sequence_eq."""
+    result = sequence.__eq__(other)
+    return result if result is NotImplemented else not result
+
+
+# Public Classes and Functions
+class CompactMapping(Mapping):
+    """Read only mapping sharing its key index with others with the same
+    keys.
+
+    :param index: dict mapping keys to their position in values
+    :param values: tuple of values
+    """
+    __slots__ = ('_index', '_values')
+
+    def __init__(self, index, values):
+        self._index = index
+        self._values = values
+
+    def __getitem__(self, key):
+        return self._values[self._index[key]]
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return "{}({!r})".format(self.__class__.__name__, dict(self.items()))
+
+    def get(self, key, default=None):
+        """Provide dict like get method"""
+        pos = self._index.get(key)
+        return default if pos is None else self._values[pos]
+
+    def items(self):
+        """Provide dict like items method"""
+        return _CompactItemsView(self)
+
+    def values(self):
+        """Provide dict like values method"""
+        return _CompactValuesView(self)
+
+
+class ScalarList(Sequence):
+    """Read only list of ints or floats stored in an array.
+
+    :param values: array
+    """
+    __slots__ = ('_array',)
+
+    def __init__(self, values):
+        self._array = values
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._array[index].tolist()
+        return self._array[index]
+
+    def __iter__(self):
+        return iter(self._array)
+
+    def __len__(self):
+        return len(self._array)
+
+    def __contains__(self, value):
+        return value in self._array
+
+    __eq__ = _sequence_eq
+    __ne__ = _sequence_ne
+    __hash__ = None
+
+    def __repr__(self):
+        return "{}({!r})".format(self.__class__.__name__, self._array.tolist())
+
+
+class CompactList(tuple):
+    """Read only list (a tuple that compares equal to lists)."""
+    __slots__ = ()
+
+    __eq__ = _sequence_eq
+    __ne__ = _sequence_ne
+    __hash__ = None
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(tuple.__getitem__(self, index))
+        return tuple.__getitem__(self, index)
+
+    def __repr__(self):
+        return "{}({!r})".format(self.__class__.__name__, list(self))
+
+
+def _scalar_array(values):
+    """Return values as an array if they are all ints or all floats."""
+    first = type(values[0])
+    if first is int:
+        typecode = INT_TYPECODE
+    elif first is float:
+        typecode = 'd'
+    else:
+        return None
+    # pylint: disable=unidiomatic-typecheck
+    for value in values:
+        if type(value) is not first:
+            return None
+    try:
+        return array(typecode, values)
+    except OverflowError:
+        return None
+
+
+class _Compactor(object):
+    """Builds compact mappings and lists, storing equal strings and key
+    indexes once."""
+
+    def __init__(self):
+        self.strings = {}
+        self.indexes = {}
+
+    def string(self, value):
+        """Return stored string equal to value."""
+        return self.strings.setdefault(value, value)
+
+    def mapping(self, keys, values):
+        """Return CompactMapping of (already compact) keys and values."""
+        # pylint: disable=unidiomatic-typecheck
+        keys = tuple(INTERN(key) if type(key) is str else key for key in keys)
+        # 1, 1.0 and True are equal (and hash alike) so include types
+        signature = tuple((type(key), key) for key in keys)
+        index = self.indexes.get(signature)
+        if index is None:
+            index = self.indexes[signature] = dict(
+                (key, pos) for pos, key in enumerate(keys)
+            )
+        return CompactMapping(index, tuple(values))
+
+    def sequence(self, values):
+        """Return ScalarList or CompactList of (already compact) values."""
+        if len(values) >= MIN_ARRAY_LENGTH:
+            scalars = _scalar_array(values)
+            if scalars is not None:
+                return ScalarList(scalars)
+        return CompactList(values)
+
+
+class _CompactLoader(object):
+    """Mixin for PyYAML loaders constructing compact config.
+
+    Each mapping or sequence is constructed as soon as it has been
+    composed, after which the nodes of its children are discarded, so
+    neither the complete node graph nor a plain copy of the config is
+    ever held in memory. Anchored nodes (and their children) and merged
+    mappings are kept whole as they may be constructed again.
+
+    N.B. loaders using libyaml (e.g. CSafeLoader) compose documents in C,
+    so the compact config is built only once the whole document has been
+    composed.
+    """
+
+    def __init__(self, stream):
+        super(_CompactLoader, self).__init__(stream)
+        self.compactor = _Compactor()
+        self._keep = 0
+        self._kept = set()
+
+    def compose_node(self, parent, index):
+        """Compose node, constructing it at once if it is a collection."""
+        if self.check_event(yaml.AliasEvent):
+            return super(_CompactLoader, self).compose_node(parent, index)
+        keep = self.peek_event().anchor is not None or (
+            getattr(index, 'tag', None) == MERGE_TAG
+        )
+        self._keep += keep
+        try:
+            node = super(_CompactLoader, self).compose_node(parent, index)
+            if self._keep:
+                self._kept.add(node)
+        finally:
+            self._keep -= keep
+        if not self._keep and isinstance(node, yaml.CollectionNode):
+            self.construct_object(node, deep=True)
+            self._discard_children(node)
+        return node
+
+    def _discard_children(self, node):
+        """Discard the nodes of children of a constructed node."""
+        if isinstance(node, yaml.MappingNode):
+            children = [child for pair in node.value for child in pair]
+        else:
+            children = node.value
+        for child in children:
+            if child not in self._kept:
+                self.constructed_objects.pop(child, None)
+                if isinstance(child, yaml.CollectionNode):
+                    child.value = []
+
+
+def _construct_mapping(loader, node):
+    """Construct CompactMapping."""
+    mapping = loader.construct_mapping(node, deep=True)
+    return loader.compactor.mapping(list(mapping), list(mapping.values()))
+
+
+def _construct_sequence(loader, node):
+    """Construct ScalarList or CompactList."""
+    return loader.compactor.sequence(
+        loader.construct_sequence(node, deep=True)
+    )
+
+
+def compact_loader(loader=yaml.SafeLoader):
+    """Return a subclass of (PyYAML) loader that constructs compact, read
+    only config (see compact) directly."""
+    compact_class = COMPACT_LOADERS.get(loader)
+    if compact_class is None:
+        construct_str = loader.yaml_constructors.get(STR_TAG)
+
+        def _construct_str(self, node):
+            """Construct string, stored once."""
+            if construct_str is None:
+                value = self.construct_scalar(node)
+            else:
+                value = construct_str(self, node)
+            return self.compactor.string(value)
+
+        compact_class = type(
+            str('Compact{}'.format(loader.__name__)),
+            (_CompactLoader, loader), {}
+        )
+        compact_class.add_constructor(MAP_TAG, _construct_mapping)
+        compact_class.add_constructor(SEQ_TAG, _construct_sequence)
+        compact_class.add_constructor(STR_TAG, _construct_str)
+        COMPACT_LOADERS[loader] = compact_class
+    return compact_class
+
+
+def compact(config):
+    """Return compact, read only copy of (parsed) config."""
+    compactor = _Compactor()
+
+    def convert(obj):
+        """Convert obj recursively."""
+        # pylint: disable=unidiomatic-typecheck
+        cls = type(obj)
+        if cls is str or cls is type(u''):
+            return compactor.string(obj)
+        if isinstance(obj, Mapping):
+            return compactor.mapping(
+                [key if type(key) is str else convert(key) for key in obj],
+                [convert(value) for value in obj.values()]
+            )
+        if cls is list:
+            return compactor.sequence([convert(value) for value in obj])
+        return obj
+
+    return convert(config)
+
+
+def thaw(config):
+    """Return plain (dict and list) copy of compacted config."""
+    if isinstance(config, Mapping):
+        return dict((key, thaw(value)) for key, value in config.items())
+    if isinstance(config, ScalarList):
+        return list(config)
+    if isinstance(config, (CompactList, list)):
+        return [thaw(value) for value in config]
+    return config
@@ -6,21 +6,30 @@ copyright (c) 2016 Earth Advantage. All rights reserved.
 
 Config class
 """
-# pylint:disable=abstract-method
+# pylint:disable=abstract-method, too-many-arguments
 
 # Imports from Standard Library
 import os
+import threading
+from collections import namedtuple
 from copy import deepcopy
 
 # Imports from Third Party Modules
 import yaml
 
 # Local Imports
+from yamlconf.compact import compact_loader, thaw
+from yamlconf.documents import find_document
 from yamlconf.exceptions import ConfigError
 from yamlconf.utils import alphasnake
 
 BASE_PATH = os.getcwd()
 
+# Everything (re)loaded by Config.load(). Replaced as a whole, never mutated.
+ConfigState = namedtuple(
+    'ConfigState', ['config', 'prefix', 'environment', 'version']
+)
+
 
 def _suffix(name, suffix=None):
     """Append suffix (default _)."""
@@ -44,18 +53,50 @@ class Config(object):
                 config_file=config_file, config_dir=config_dir,
                 section=section, env_prefix='GBR_CONFIG'
             )
+
+    Set schema to a yamlconf.schema.Schema to have the config validated
+    each time it is loaded.
+
+    If the config file is a multi-document YAML stream supply document to
+    select the document whose document_key (default name) matches it, or
+    an int to select by position. Only that document is parsed.
+
+    Config is read from config_file unless a source (see yamlconf.sources)
+    is supplied, e.g. HTTPSource to fetch it from a URL. Environment
+    variables and sections work the same whatever the source.
+
+    Set compact to store very large configs in a compact, read only form
+    (see yamlconf.compact). get, keys, items and values work as normal,
+    but config is made up of read only mappings rather than dicts.
+
+    Concurrency: Config may be shared between threads, including while
+    load() is called to reload it. Everything load() sets is held in a
+    single immutable ConfigState, replaced by one reference assignment
+    once loading has succeeded, and the loaded config is never mutated
+    after that. Each read method (get, keys, items, values, deepcopy)
+    takes the current state once, so sees either the old or the new
+    config (and prefix), never a mix of both, without taking a lock.
+    Calls to load() are serialized.
     """
     # pylint: disable=too-few-public-methods, too-many-instance-attributes
     default_file = 'config.yaml'
     default_config_root = os.path.join(BASE_PATH, 'config')
+    # yamlconf.schema.Schema, validated on load
+    schema = None
+    # top level key identifying documents in multi-document files
+    document_key = 'name'
 
     def __init__(self, config_file=None, config_dir=None, section=None,
-                 env_prefix=None, loader=yaml.SafeLoader):
+                 env_prefix=None, loader=yaml.SafeLoader, document=None,
+                 source=None, compact=False):
         if not env_prefix:
             raise ConfigError('env_prefix can not be null.')
         self.env_prefix = env_prefix
-        self.config = {}
-        self.prefix = None
+        self._state = ConfigState(
+            config={}, prefix=None, environment=None, version=None
+        )
+        self._load_lock = threading.Lock()
+        self._schema_env_names = {}
         self.config_path = self.env_prefix + '_PATH'
         self.config_prefix = self.env_prefix + '_PREFIX'
         self.config_root_path = self.env_prefix + '_ROOT'
@@ -70,21 +111,127 @@ class Config(object):
             filename=config_file, config_dir=config_dir
         )
         self.loader = loader
+        self.document = document
+        self.source = source
+        self.compact = compact
         self.load()
 
+    @property
+    def config(self):
+        """Loaded config (dict)."""
+        return self._state.config
+
+    @config.setter
+    def config(self, config):
+        with self._load_lock:
+            self._state = self._state._replace(
+                config=config, environment=None, version=None
+            )
+
+    @property
+    def prefix(self):
+        """Prefix for environment variables."""
+        return self._state.prefix
+
+    @prefix.setter
+    def prefix(self, prefix):
+        with self._load_lock:
+            self._state = self._state._replace(prefix=prefix)
+
     def load(self):
-        """(Re)Load config file."""
-        try:
-            with open(self.config_file) as configfile:
-                self.config = yaml.load(configfile, Loader=self.loader)
-        except TypeError:
-            # no config file (use environment variables)
-            pass
-        if self.config:
-            self.prefix = self.config.get('config_prefix', None)
-        if not self.prefix:
+        """(Re)Load config file.
+
+        If a schema is set the config (including environment overrides) is
+        validated and a ConfigError listing all violations is raised if it
+        does not conform. In that case the existing config is retained.
+
+        Safe to call while other threads are reading config, see Config.
+        """
+        with self._load_lock:
+            self._state = self._load(self._state)
+
+    def _load(self, state):
+        """Return new ConfigState, replacing state."""
+        config = state.config
+        version = state.version
+        if self.source is not None:
+            text, version = self.source.fetch(state.version)
+            if version != state.version:
+                config = self._parse(text)
+        else:
+            try:
+                with open(self.config_file) as configfile:
+                    config = self._parse(configfile)
+            except TypeError:
+                # no config file (use environment variables)
+                pass
+        prefix = self._find_prefix(config, state.prefix)
+        environment = None
+        if self.schema:
+            if prefix not in self._schema_env_names:
+                self._schema_env_names[prefix] = self.schema.env_names(
+                    lambda var, section: self._env_var(var, section, prefix)
+                )
+            env_names = self._schema_env_names[prefix]
+            environment = self.schema.environment(env_names)
+            # config is only reused, rather than parsed again, if its source
+            # is unchanged, in which case it has already been validated
+            errors = []
+            if config is not state.config or (
+                    environment != state.environment):
+                errors = self.schema.validate(config, env_names, environment)
+            if errors:
+                msg = "Invalid config"
+                if self._origin():
+                    msg = "{} in {}".format(msg, self._origin())
+                raise ConfigError("{}\n{}".format(msg, "\n".join(errors)))
+        if self.source is not None and version != state.version:
+            self.source.accept(version)
+        return ConfigState(
+            config=config, prefix=prefix, environment=environment,
+            version=version
+        )
+
+    def _origin(self):
+        """Describe where config is loaded from, for error messages."""
+        if self.source is not None:
+            return "source: {}".format(self.source)
+        if self.config_file:
+            return "file: {}".format(self.config_file)
+        return None
+
+    def _parse(self, stream):
+        """Parse config from file or text."""
+        # compact config is built while parsing, never as plain dicts
+        loader = compact_loader(self.loader) if self.compact else (
+            self.loader
+        )
+        if self.document is None:
+            return yaml.load(stream, Loader=loader)
+        if hasattr(stream, 'read'):
+            stream = stream.read()
+        return self._load_document(stream, loader)
+
+    def _load_document(self, text, loader):
+        """Parse the selected document from a multi-document stream."""
+        span = find_document(
+            text, self.document, key=self.document_key, loader=self.loader
+        )
+        if not span:
+            msg = "Could not find document '{}'".format(self.document)
+            if not isinstance(self.document, int):
+                msg = "{} ({})".format(msg, self.document_key)
+            raise ConfigError("{} in {}".format(msg, self._origin()))
+        start, end = span
+        return yaml.load(text[start:end], Loader=loader)
+
+    def _find_prefix(self, config, prefix=None):
+        """Determine prefix for environment variables."""
+        if config:
+            prefix = config.get('config_prefix', None)
+        if not prefix:
             if os.getenv(self.config_prefix):
-                self.prefix = os.getenv(self.config_prefix)
+                prefix = os.getenv(self.config_prefix)
             else:
                 for path in [
                     os.path.join(self.basepath, self.default_file),
@@ -92,13 +239,25 @@ class Config(object):
                 ]:
                     if os.path.exists(path):
                         with open(path) as conf:
-                            config = yaml.load(conf, Loader=self.loader)
-                            prefix = config.get(
+                            default_config = yaml.load(
+                                conf, Loader=self.loader
+                            )
+                            found = default_config.get(
                                 self.config_prefix.lower(), None
                             )
-                            if prefix:
-                                self.prefix = prefix
+                            if found:
+                                prefix = found
                                 break
+        return prefix
+
+    @staticmethod
+    def _env_var(var, section, prefix):
+        """Name of environment variable overriding var."""
+        return "{}{}{}".format(
+            _suffix(prefix) if prefix else '',
+            _suffix(alphasnake(section)) if section else '',
+            alphasnake(str(var))
+        ).upper()
 
     def get(self, var, section=None, **kwargs):
         """Retrieve a config var.
@@ -117,12 +276,10 @@ class Config(object):
         if not section and self.section:
             section = self.section
         default = kwargs.get('default', None)
-        env_var = "{}{}{}".format(
-            _suffix(self.prefix) if self.prefix else '',
-            _suffix(alphasnake(section)) if section else '',
-            alphasnake(str(var))
-        ).upper()
-        config = self.config.get(section, {}) if section else self.config
+        state = self._state
+        env_var = self._env_var(var, section, state.prefix)
+        config = state.config
+        config = config.get(section, {}) if section else config
         result = config.get(var, default)
         result = os.getenv(env_var, default=result)
         # no default keyword supplied (and no result)
@@ -134,8 +291,8 @@ class Config(object):
                     msg, section
                 )
             msg = "{} Checked environment variable: {}".format(msg, env_var)
-            if self.config_file:
-                msg = "{} and file: {}".format(msg, self.config_file)
+            if self._origin():
+                msg = "{} and {}".format(msg, self._origin())
             raise ConfigError(msg)
         return result
 
@@ -143,21 +300,24 @@ class Config(object):
         """Provide dict like keys method"""
         if not section and self.section:
             section = self.section
-        config = self.config.get(section, {}) if section else self.config
+        config = self._state.config
+        config = config.get(section, {}) if section else config
         return config.keys()
 
     def items(self, section=None):
         """Provide dict like items method"""
         if not section and self.section:
             section = self.section
-        config = self.config.get(section, {}) if section else self.config
+        config = self._state.config
+        config = config.get(section, {}) if section else config
         return config.items()
 
     def values(self, section=None):
         """Provide dict like values method"""
         if not section and self.section:
             section = self.section
-        config = self.config.get(section, {}) if section else self.config
+        config = self._state.config
+        config = config.get(section, {}) if section else config
         return config.values()
 
     def __copy__(self):
@@ -168,10 +328,11 @@ class Config(object):
         self.__copy__()
 
     def __deepcopy__(self, memo):
+        config = self._state.config
         if self.section:
-            config = self.config.get(self.section, {})
-        else:
-            config = self.config
+            config = config.get(self.section, {})
+        if self.compact:
+            return thaw(config)
         return deepcopy(config, memo)
 
     def _get_filepath(self, filename=None, config_dir=None):
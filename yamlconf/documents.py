@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+copyright (c) 2016 Earth Advantage. All rights reserved.
+..codeauthor::Paul Munday <paul@paulmunday.net>
+
+Multi-document YAML streams.
+
+Documents are located by scanning for document markers (--- and ...) at
+the start of a line, without parsing them, so only the document that is
+actually wanted need be built.
+"""
+
+# Imports from Standard Library
+import re
+
+# Imports from Third Party Modules
+import yaml
+
+# Constants
+MARKER = re.compile(r'^(?:---|\.\.\.)(?=[ \t\r\n]|$)', re.M)
+# any line that is not blank, a comment or a directive
+CONTENT = re.compile(r'^[ \t]*[^\s#%]', re.M)
+
+
+# Public Classes and Functions
+def iter_documents(text):
+    """Yield (start, end) of each document in a YAML stream.
+
+    Any directives preceding a document are included in its span.
+    """
+    start = 0
+    for match in MARKER.finditer(text):
+        pos = match.start()
+        if match.group() == '---':
+            if CONTENT.search(text, start, pos):
+                yield start, pos
+                start = pos
+            # otherwise only directives/comments so far, keep with document
+        else:
+            if CONTENT.search(text, start, pos):
+                yield start, pos
+            end_of_line = text.find('\n', match.end())
+            start = end_of_line + 1 if end_of_line != -1 else len(text)
+    if CONTENT.search(text, start):
+        yield start, len(text)
+
+
+def document_key(text, start, end, key, loader=yaml.SafeLoader):
+    """Value of top level key in document text[start:end], or None.
+
+    Usually only the line containing key is parsed. If key is not found
+    that way (e.g. it is quoted or its value continues on following lines)
+    the document is composed, but only the value of key is constructed.
+    """
+    pattern = re.compile(
+        r'^{}[ \t]*:.*$'.format(re.escape(str(key))), re.M
+    )
+    match = pattern.search(text, start, end)
+    if match:
+        try:
+            value = yaml.load(match.group(), Loader=loader)[key]
+        except (yaml.YAMLError, TypeError, KeyError):
+            value = None
+        # empty if e.g. the value is a block scalar on following lines
+        if value is not None and value != '':
+            return value
+    return _compose_key(text[start:end], key, loader)
+
+
+def _compose_key(text, key, loader):
+    """Value of top level key in document text, or None."""
+    constructor = loader(text)
+    try:
+        node = constructor.get_single_node()
+        if not isinstance(node, yaml.MappingNode):
+            return None
+        for key_node, value_node in node.value:
+            if isinstance(key_node, yaml.ScalarNode) and (
+                    constructor.construct_object(key_node) == key):
+                return constructor.construct_object(value_node, deep=True)
+    except yaml.YAMLError:
+        pass
+    finally:
+        constructor.dispose()
+    return None
+
+
+def find_document(text, document, key='name', loader=yaml.SafeLoader):
+    """Return (start, end) of document in a YAML stream, or None.
+
+    :param text: YAML stream
+    :param document: value of key in the document wanted, or if an int its
+                     (zero based) position in the stream
+    :param key: top level key identifying documents
+    """
+    spans = iter_documents(text)
+    if isinstance(document, int) and not isinstance(document, bool):
+        for num, span in enumerate(spans):
+            if num == document:
+                return span
+        return None
+    for start, end in spans:
+        if document_key(text, start, end, key, loader) == document:
+            return start, end
+    return None
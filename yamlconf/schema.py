@@ -0,0 +1,395 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+copyright (c) 2016 Earth Advantage. All rights reserved.
+..codeauthor::Paul Munday <paul@paulmunday.net>
+
+Config schemas.
+
+A schema is declared as a (nested) dict mapping keys to a type, a tuple of
+types, a Field or a further dict (a section). It is compiled once, when
+the Schema is created, into a closure per key that only performs the checks
+that key actually declares.
+
+eg:
+class GBRConfig(Config):
+    schema = Schema({
+        'database': {
+            'host': str,
+            'port': Field(int, min_value=1, max_value=65535),
+        },
+        'debug': Field(bool, required=False),
+    })
+"""
+
+# Imports from Standard Library
+import os
+
+# Local Imports
+from yamlconf.compact import CompactList, CompactMapping, ScalarList
+
+try:
+    from collections.abc import Mapping
+except ImportError:     # Python 2
+    from collections import Mapping     # pylint: disable=ungrouped-imports
+
+# Constants
+MISSING = object()
+TRUE_VALUES = ('true', 'yes', 'on', '1')
+FALSE_VALUES = ('false', 'no', 'off', '0')
+try:
+    STRING_TYPES = (str, unicode)   # noqa pylint: disable=undefined-variable
+except NameError:
+    STRING_TYPES = (str,)
+# can not be set from (or converted from) environment variables
+CONTAINER_TYPES = (Mapping, list, tuple, set, frozenset)
+
+
+# Helper Functions & Classes
+def _join(path, key):
+    """Dotted path to key, used in error messages."""
+    return "{}.{}".format(path, key) if path else str(key)
+
+
+def _expand_types(types):
+    """Add types that stand in for types, e.g. in compact configs."""
+    if str in types:
+        types = types + STRING_TYPES
+    if dict in types:
+        types = types + (CompactMapping,)
+    if list in types:
+        types = types + (CompactList, ScalarList)
+    return tuple(sorted(set(types), key=types.index))
+
+
+def _type_name(types):
+    """Human readable name for one or more types."""
+    return ' or '.join(type_.__name__ for type_ in types)
+
+
+def _not_comparable(value, bound):
+    """Error message for a value that can not be compared with a bound."""
+    return "{!r} can not be compared with {!r}".format(value, bound)
+
+
+def _compile_type_check(types):
+    """Return a closure checking a value is an instance of types."""
+    name = _type_name(types)
+    types = _expand_types(types)
+    # bool is a subclass of int but is rarely what is meant by int
+    reject_bool = bool not in types and any(
+        issubclass(bool, type_) for type_ in types
+    )
+
+    def check(value):
+        """Check type."""
+        if not isinstance(value, types) or (
+                reject_bool and isinstance(value, bool)):
+            return "expected {}, got {}".format(name, type(value).__name__)
+        return None
+    return check
+
+
+def _compile_coerce(types):
+    """Return a closure converting an environment string to types.
+
+    Returns None if none of types can be set from the environment.
+    """
+    types = tuple(
+        type_ for type_ in types if not issubclass(type_, CONTAINER_TYPES)
+    )
+    if not types:
+        return None
+    if bool in types:
+        def coerce(value):
+            """Convert to bool."""
+            lowered = value.lower()
+            if lowered in TRUE_VALUES:
+                return True
+            if lowered in FALSE_VALUES:
+                return False
+            raise ValueError(value)
+    elif any(issubclass(type_, STRING_TYPES) for type_ in types):
+        def coerce(value):
+            """Strings are used as is."""
+            return value
+    else:
+        def coerce(value):
+            """Convert using the first type that accepts value."""
+            for type_ in types:
+                try:
+                    return type_(value)
+                except (TypeError, ValueError):
+                    pass
+            raise ValueError(value)
+    return coerce
+
+
+def _compile_fast_check(types, min_value, max_value):
+    """Return a closure cheaply testing a value is valid, or None.
+
+    The closure only returns True for values that are certainly valid so
+    anything else (including subclasses of types) is left to the full
+    checks, which also produce the error messages.
+    """
+    if not types:
+        return None
+    exact = frozenset(_expand_types(types))
+    # pylint: disable=function-redefined
+    if min_value is None and max_value is None:
+        def check(value):
+            """Check type."""
+            return value.__class__ in exact
+    elif max_value is None:
+        def check(value):
+            """Check type and lower bound."""
+            return value.__class__ in exact and value >= min_value
+    elif min_value is None:
+        def check(value):
+            """Check type and upper bound."""
+            return value.__class__ in exact and value <= max_value
+    else:
+        def check(value):
+            """Check type and bounds."""
+            return (
+                value.__class__ in exact and min_value <= value <= max_value
+            )
+    return check
+
+
+# Public Classes and Functions
+class Field(object):
+    """Schema entry for a single config value.
+
+    :param types: type or tuple of types the value must be an instance of
+    :param required: raise an error if the value is missing (or None)
+    :param min_value: minimum permitted value (inclusive)
+    :param max_value: maximum permitted value (inclusive)
+    :param choices: permitted values
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, types=None, required=True, min_value=None,
+                 max_value=None, choices=None):
+        if types is not None and not isinstance(types, tuple):
+            types = (types,)
+        self.types = types
+        self.required = required
+        self.min_value = min_value
+        self.max_value = max_value
+        self.choices = tuple(choices) if choices is not None else None
+
+    def compile(self, path):
+        """Return a closure validating a value for this field.
+
+        The closure is called as validate(value, errors, env_value=None)
+        where value is MISSING if the key is absent and env_value is the
+        (string) value of any environment variable overriding it. Any
+        violations are appended to errors.
+        """
+        checks = []
+        coerce = None
+        if self.types:
+            checks.append(_compile_type_check(self.types))
+            coerce = _compile_coerce(self.types)
+        if self.min_value is not None:
+            min_value = self.min_value
+
+            def check_min(value):
+                """Check lower bound."""
+                try:
+                    if value < min_value:
+                        return "{!r} is less than {!r}".format(
+                            value, min_value
+                        )
+                except TypeError:
+                    return _not_comparable(value, min_value)
+                return None
+            checks.append(check_min)
+        if self.max_value is not None:
+            max_value = self.max_value
+
+            def check_max(value):
+                """Check upper bound."""
+                try:
+                    if value > max_value:
+                        return "{!r} is greater than {!r}".format(
+                            value, max_value
+                        )
+                except TypeError:
+                    return _not_comparable(value, max_value)
+                return None
+            checks.append(check_max)
+        if self.choices is not None:
+            choices = self.choices
+
+            def check_choices(value):
+                """Check permitted values."""
+                if value not in choices:
+                    return "{!r} is not one of {!r}".format(value, choices)
+                return None
+            checks.append(check_choices)
+        required = self.required
+
+        def validate(value, errors, env_value=None):
+            """Validate value, appending violations to errors."""
+            source = path
+            if env_value is not None:
+                source = "{} (environment)".format(path)
+                if coerce:
+                    try:
+                        value = coerce(env_value)
+                    except ValueError:
+                        errors.append("{}: {!r} is not a valid {}".format(
+                            source, env_value, _type_name(self.types)
+                        ))
+                        return
+                elif self.types:
+                    errors.append(
+                        "{}: {} can not be set from the environment".format(
+                            source, _type_name(self.types)
+                        )
+                    )
+                    return
+                else:
+                    value = env_value
+            if value is MISSING or value is None:
+                if required:
+                    errors.append("{}: required value is missing".format(
+                        source
+                    ))
+                return
+            for check in checks:
+                msg = check(value)
+                if msg:
+                    errors.append("{}: {}".format(source, msg))
+                    # later checks assume the earlier ones passed
+                    break
+        return validate
+
+
+def _compile_node(path, spec):
+    """Compile a schema entry (Field, type(s) or dict).
+
+    :returns: (fast check or None, validator)
+    """
+    if isinstance(spec, Mapping):
+        return None, _compile_section(path, spec)
+    if not isinstance(spec, Field):
+        spec = Field(spec)
+    fast_check = None
+    if spec.choices is None:
+        fast_check = _compile_fast_check(
+            spec.types, spec.min_value, spec.max_value
+        )
+    return fast_check, spec.compile(path)
+
+
+def _compile_section(path, spec):
+    """Return a closure validating a (nested) section of config."""
+    children = [
+        (key,) + _compile_node(_join(path, key), child)
+        for key, child in spec.items()
+    ]
+
+    def validate(value, errors, env_values=None):
+        """Validate section, appending violations to errors.
+
+        env_values maps keys in this section to environment overrides.
+        """
+        if value is MISSING or value is None:
+            value = {}
+        elif value.__class__ is not dict and not isinstance(value, Mapping):
+            errors.append("{}: expected a mapping, got {}".format(
+                path, type(value).__name__
+            ))
+            return
+        get = value.get
+        if env_values:
+            for key, _, child in children:
+                child(get(key, MISSING), errors, env_values.get(key))
+            return
+        for key, fast_check, child in children:
+            item = get(key, MISSING)
+            if fast_check is None or not fast_check(item):
+                child(item, errors)
+    return validate
+
+
+class Schema(object):
+    """Compiled config schema.
+
+    :param spec: dict mapping keys to a type, tuple of types, Field or a
+                 nested dict (section).
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        self._validators = []
+        for key, child in spec.items():
+            if isinstance(child, Mapping):
+                # only values one section deep can be set in the environment
+                env_keys = tuple(
+                    name for name, value in child.items()
+                    if not isinstance(value, Mapping)
+                )
+            else:
+                env_keys = None
+            self._validators.append(
+                (key, _compile_node(str(key), child)[1], env_keys)
+            )
+
+    def env_names(self, env_var):
+        """Names of environment variables that may override config values.
+
+        :param env_var: callable taking var and section and returning the
+                        name of the environment variable overriding it
+        :returns: opaque value to pass to validate. It only depends on
+                  env_var so can be reused while that is unchanged.
+        """
+        names = []
+        for key, _, env_keys in self._validators:
+            if env_keys is None:
+                names.append(env_var(key, None))
+            else:
+                names.append(tuple(env_var(name, key) for name in env_keys))
+        return names
+
+    def environment(self, env_names):
+        """Current values of environment overrides (None if unset).
+
+        :param env_names: as returned by env_names()
+        :returns: tuple, which may be compared with one returned earlier to
+                  tell if the environment overrides have changed
+        """
+        # os.environ.get is comparatively slow, so look up in a plain copy
+        getenv = dict(os.environ).get
+        return tuple(
+            getenv(names) if env_keys is None else tuple(
+                getenv(name) for name in names
+            )
+            for (_, _, env_keys), names in zip(self._validators, env_names)
+        )
+
+    def validate(self, config, env_names, environment=None):
+        """Validate config (including environment overrides).
+
+        :param config: (parsed) config dict
+        :param env_names: as returned by env_names()
+        :param environment: as returned by environment(), if already known
+        :returns: list of violations
+        """
+        errors = []
+        config = config if config is not None else {}
+        if environment is None:
+            environment = self.environment(env_names)
+        for (key, validate, env_keys), env in zip(
+                self._validators, environment):
+            value = config.get(key, MISSING)
+            if env_keys is None:
+                validate(value, errors, env)
+            elif any(env):
+                validate(value, errors, dict(zip(env_keys, env)))
+            else:
+                validate(value, errors)
+        return errors
@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+copyright (c) 2016 Earth Advantage. All rights reserved.
+..codeauthor::Paul Munday <paul@paulmunday.net>
+
+Config sources other than local files (the default).
+
+A source is passed to Config as source and returns the config text for
+Config.load() to parse. Each fetch is also given the version last loaded
+from it so an unchanged config need not be fetched or parsed again.
+"""
+
+# Imports from Standard Library
+import errno
+import os
+import re
+import threading
+
+# Local Imports
+from yamlconf.exceptions import ConfigError
+
+try:
+    from http.client import (
+        BadStatusLine,
+        HTTPConnection,
+        HTTPException,
+        HTTPSConnection,
+    )
+    from urllib.parse import urlsplit
+except ImportError:     # Python 2
+    from httplib import (
+        BadStatusLine,
+        HTTPConnection,
+        HTTPException,
+        HTTPSConnection,
+    )
+    from urlparse import urlsplit
+
+# Constants
+CHARSET = re.compile(r'charset=["\']?([\w-]+)', re.I)
+# errors meaning the server closed a kept alive connection
+DROPPED_ERRNOS = (errno.ECONNRESET, errno.EPIPE, errno.ECONNABORTED)
+
+
+# Helper Functions & Classes
+def _dropped(error):
+    """Test if error means an idle connection was closed by the server."""
+    # RemoteDisconnected (Python 3) is a subclass of BadStatusLine
+    return isinstance(error, BadStatusLine) or (
+        getattr(error, 'errno', None) in DROPPED_ERRNOS
+    )
+
+
+# Public Classes and Functions
+class Source(object):
+    """Base class for config sources."""
+    # pylint: disable=too-few-public-methods
+
+    def fetch(self, version=None):
+        """Return (text, version) of config.
+
+        :param version: version returned by the fetch the config in use was
+                        loaded from, if any.
+        If the returned version is equal to version text may be None,
+        the config is unchanged.
+        """
+        raise NotImplementedError
+
+    def accept(self, version):
+        """Called once the config returned by fetch as version has been
+        parsed (and validated) successfully, so is good to fall back to.
+        """
+        pass
+
+
+class ConnectionPool(object):
+    """Thread safe pool of persistent HTTP(S) connections, by host.
+
+    :param maxsize: maximum number of idle connections kept per host
+    """
+
+    def __init__(self, maxsize=4):
+        self.maxsize = maxsize
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def get(self, scheme, netloc, timeout):
+        """Return (connection, reused)."""
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            conn = idle.pop() if idle else None
+        if conn is None:
+            return self.connect(scheme, netloc, timeout), False
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn, True
+
+    @staticmethod
+    def connect(scheme, netloc, timeout):
+        """Return a new (not pooled) connection."""
+        conn_class = HTTPSConnection if scheme == 'https' else HTTPConnection
+        return conn_class(netloc, timeout=timeout)
+
+    def put(self, scheme, netloc, conn):
+        """Return connection to the pool for reuse."""
+        with self._lock:
+            idle = self._idle.setdefault((scheme, netloc), [])
+            if len(idle) < self.maxsize:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def clear(self):
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
+# shared by all HTTPSources unless one is supplied
+POOL = ConnectionPool()
+
+
+class HTTPSource(Source):
+    """Fetch config from an HTTP(S) URL.
+
+    Connections are kept open and reused (see ConnectionPool). Requests
+    are conditional (If-None-Match) when the server supplied an ETag, so
+    an unchanged config is neither transferred nor parsed again.
+
+    If the config can not be fetched the last good copy (one that was
+    accepted by Config) is used or, if there is none, the copy stored in
+    cache_file (if given).
+
+    :param url: URL of config
+    :param timeout: socket timeout in seconds
+    :param cache_file: path of file to store the last copy fetched in
+    :param headers: additional request headers e.g. Authorization
+    :param pool: ConnectionPool, defaults to one shared by all HTTPSources
+    """
+    # pylint: disable=too-many-arguments, too-many-instance-attributes
+
+    def __init__(self, url, timeout=10, cache_file=None, headers=None,
+                 pool=None):
+        self.url = url
+        self.timeout = timeout
+        self.cache_file = cache_file
+        self.headers = headers or {}
+        self.pool = pool or POOL
+        parts = urlsplit(url)
+        self._scheme = parts.scheme
+        self._netloc = parts.netloc
+        self._path = parts.path or '/'
+        if parts.query:
+            self._path = "{}?{}".format(self._path, parts.query)
+        # last good copy
+        self._text = None
+        self._etag = None
+        self._version = 0
+        # fetched but not yet accepted: (version, text, etag)
+        self._pending = None
+        self._fetched = 0
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return self.url
+
+    def fetch(self, version=None):
+        """Return (text, version) of config."""
+        headers = dict(self.headers)
+        with self._lock:
+            if self._etag and self._text is not None:
+                headers['If-None-Match'] = self._etag
+            try:
+                status, etag, text = self._request(headers)
+            except (EnvironmentError, HTTPException) as err:
+                return self._fallback(err)
+            if status == 200:
+                self._fetched += 1
+                self._pending = (self._fetched, text, etag)
+                return text, self._fetched
+            if status != 304 or self._text is None:
+                return self._fallback("HTTP status {}".format(status))
+            if self._version == version:
+                return None, version
+            return self._text, self._version
+
+    def _request(self, headers):
+        """Return (status, etag, text)."""
+        conn, reused = self.pool.get(self._scheme, self._netloc, self.timeout)
+        while True:
+            try:
+                conn.request('GET', self._path, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+            except (EnvironmentError, HTTPException) as err:
+                conn.close()
+                if not reused or not _dropped(err):
+                    raise
+                # the server closed an idle connection, so others idle as
+                # long may be closed too, retry once with a new connection
+                conn = self.pool.connect(
+                    self._scheme, self._netloc, self.timeout
+                )
+                reused = False
+                continue
+            break
+        if response.will_close:
+            conn.close()
+        else:
+            self.pool.put(self._scheme, self._netloc, conn)
+        charset = CHARSET.search(response.getheader('Content-Type') or '')
+        text = body.decode(charset.group(1) if charset else 'utf-8')
+        return response.status, response.getheader('ETag'), text
+
+    def _fallback(self, error):
+        """Return last good copy if fetching fails."""
+        if self._text is None and self.cache_file and os.path.exists(
+                self.cache_file):
+            with open(self.cache_file, 'rb') as cache_file:
+                self._text = cache_file.read().decode('utf-8')
+            self._etag = None
+            self._fetched += 1
+            self._version = self._fetched
+        if self._text is None:
+            raise ConfigError("Could not fetch config from {}: {}".format(
+                self.url, error
+            ))
+        return self._text, self._version
+
+    def accept(self, version):
+        """Keep config fetched as version as the last good copy."""
+        with self._lock:
+            if self._pending and self._pending[0] == version:
+                self._version, self._text, self._etag = self._pending
+                self._pending = None
+                self._save()
+
+    def _save(self):
+        """Store copy in cache_file."""
+        if not self.cache_file:
+            return
+        tmp_file = "{}.tmp".format(self.cache_file)
+        with open(tmp_file, 'wb') as cache_file:
+            cache_file.write(self._text.encode('utf-8'))
+        getattr(os, 'replace', os.rename)(tmp_file, self.cache_file)
@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+copyright (c) 2016 Earth Advantage. All rights reserved.
+..codeauthor::Paul Munday <paul@paulmunday.net>
+
+Tests for compact config
+"""
+
+# Imports from Standard Library
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from copy import deepcopy
+
+# Imports from Third Party Modules
+import yaml
+
+# Local Imports
+from yamlconf import Config, Field, Schema
+from yamlconf.compact import (
+    CompactList,
+    CompactMapping,
+    ScalarList,
+    compact,
+    compact_loader,
+    thaw,
+)
+
+PY3 = sys.version_info[0] == 3
+if PY3:
+    from unittest import mock
+else:
+    import mock
+
+
+# Constants
+CONFIG = """
+config_prefix: COMPACT
+name: compact
+options: {debug: false}
+servers:
+    - {host: alpha, port: 80, tags: [web, public]}
+    - {host: beta, port: 81, tags: [web, public]}
+ints: [%s]
+floats: [%s]
+mixed: [%s, true]
+defaults: &defaults
+    port: 80
+    tags: [web, {zone: a}]
+merged:
+    <<: *defaults
+    host: gamma
+inline:
+    <<: {port: 82, tags: [internal, {zone: b}]}
+    host: delta
+aliased: [*defaults, *defaults]
+""" % (
+    ', '.join(str(num) for num in range(20)),
+    ', '.join(str(num / 2.0) for num in range(20)),
+    ', '.join(str(num) for num in range(20)),
+)
+
+
+# Helper Functions & Classes
+class CompactConfig(Config):
+    """Config class for compact configs"""
+    # pylint: disable=too-few-public-methods
+    schema = Schema({
+        'name': str,
+        'options': Field(dict),
+        'servers': Field(list),
+        'ints': Field(list),
+    })
+
+    def __init__(self, section=None):
+        super(CompactConfig, self).__init__(
+            env_prefix='COMPACT_CONFIG', section=section, compact=True
+        )
+
+
+# Tests
+class CompactTests(unittest.TestCase):
+    """Tests for compacting parsed config."""
+    # pylint: disable=protected-access
+
+    def setUp(self):
+        self.config = yaml.safe_load(CONFIG)
+        self.compact = compact(self.config)
+
+    def test_equal(self):
+        """Test compact config compares equal to the original"""
+        self.assertEqual(self.config, self.compact)
+        self.assertEqual(self.config, thaw(self.compact))
+        self.assertIsInstance(thaw(self.compact)['ints'], list)
+
+    def test_mappings(self):
+        """Test mappings with the same keys share their index"""
+        alpha, beta = self.compact['servers']
+        self.assertIsInstance(alpha, CompactMapping)
+        self.assertIs(alpha._index, beta._index)
+        self.assertEqual(80, alpha['port'])
+        self.assertEqual(81, beta.get('port'))
+        self.assertEqual('default', beta.get('missing', 'default'))
+        self.assertIn('host', alpha)
+        self.assertEqual(['host', 'port', 'tags'], list(alpha.keys()))
+        self.assertEqual(
+            [('host', 'alpha'), ('port', 80), ('tags', ['web', 'public'])],
+            list(alpha.items())
+        )
+        with self.assertRaises(KeyError):
+            alpha['missing']     # pylint: disable=pointless-statement
+        with self.assertRaises(TypeError):
+            # pylint: disable=unsupported-assignment-operation
+            alpha['host'] = 'gamma'
+
+    def test_key_types(self):
+        """Test keys that are equal but of different types keep their type"""
+        config = yaml.safe_load("a:\n  1: x\nb:\n  on: y\nc:\n  1.0: z\n")
+        compacted = compact(config)
+        self.assertEqual([1], list(compacted['a'].keys()))
+        self.assertEqual([True], list(compacted['b'].keys()))
+        self.assertIs(True, list(compacted['b'].keys())[0])
+        self.assertIsInstance(list(compacted['c'].keys())[0], float)
+        self.assertEqual(config, thaw(compacted))
+
+    def test_read_only(self):
+        """Test lists can not be changed"""
+        tags = self.compact['servers'][0]['tags']
+        self.assertIsInstance(tags, CompactList)
+        self.assertEqual(['web', 'public'], tags)
+        self.assertEqual(tags, ['web', 'public'])
+        self.assertEqual(['web'], tags[:1])
+        with self.assertRaises(TypeError):
+            # pylint: disable=unsupported-assignment-operation
+            tags[0] = 'private'
+        with self.assertRaises(AttributeError):
+            tags.append('private')   # pylint: disable=no-member
+
+    def test_views(self):
+        """Test keys, items and values are views"""
+        alpha = self.compact['servers'][0]
+        self.assertEqual(
+            list(self.config['servers'][0].values()), list(alpha.values())
+        )
+        self.assertIn(80, alpha.values())
+        self.assertEqual(3, len(alpha.values()))
+        self.assertIn(('port', 80), alpha.items())
+        self.assertEqual(
+            self.config['servers'][0].items(), alpha.items()
+        )
+
+    def test_strings(self):
+        """Test equal strings are stored once"""
+        alpha, beta = self.compact['servers']
+        self.assertIs(alpha['tags'][0], beta['tags'][0])
+
+    def test_scalar_lists(self):
+        """Test long lists of ints or floats are stored in arrays"""
+        self.assertIsInstance(self.compact['ints'], ScalarList)
+        self.assertIsInstance(self.compact['floats'], ScalarList)
+        self.assertIsInstance(self.compact['mixed'], CompactList)
+        self.assertEqual(self.config['mixed'], self.compact['mixed'])
+        self.assertEqual(self.config['ints'], self.compact['ints'])
+        self.assertEqual(self.compact['floats'], self.config['floats'])
+        self.assertEqual([2, 3], self.compact['ints'][2:4])
+        self.assertEqual(19, self.compact['ints'][-1])
+        self.assertIn(9.5, self.compact['floats'])
+        self.assertNotEqual(self.compact['ints'], self.compact['floats'])
+
+
+class CompactLoaderTests(unittest.TestCase):
+    """Tests for constructing compact config while parsing."""
+
+    def test_equal(self):
+        """Test loaders build the same config as compact"""
+        loaders = [yaml.SafeLoader, yaml.BaseLoader]
+        if getattr(yaml, 'CSafeLoader', None):
+            loaders.append(yaml.CSafeLoader)
+        for loader in loaders:
+            expected = compact(yaml.load(CONFIG, Loader=loader))
+            config = yaml.load(CONFIG, Loader=compact_loader(loader))
+            self.assertEqual(expected, config)
+            self.assertEqual(thaw(expected), thaw(config))
+            self.assertIsInstance(config, CompactMapping)
+            self.assertIsInstance(config['servers'], CompactList)
+            self.assertIsInstance(
+                config['defaults']['tags'][1], CompactMapping
+            )
+
+    def test_compact(self):
+        """Test strings, key indexes and lists are compacted"""
+        # pylint: disable=protected-access
+        config = yaml.load(CONFIG, Loader=compact_loader())
+        alpha, beta = config['servers']
+        self.assertIs(alpha._index, beta._index)
+        self.assertIs(alpha['tags'][0], beta['tags'][0])
+        self.assertIsInstance(config['ints'], ScalarList)
+        self.assertIs(compact_loader(), compact_loader(yaml.SafeLoader))
+        config = yaml.load(
+            "a:\n  1: x\nb:\n  on: y\n", Loader=compact_loader()
+        )
+        self.assertIs(True, list(config['b'].keys())[0])
+
+    def test_nodes_discarded(self):
+        """Test nodes are discarded once constructed"""
+        loader = compact_loader()(CONFIG)
+        try:
+            node = loader.get_single_node()
+            servers = [value for key, value in node.value
+                       if key.value == 'servers'][0]
+            self.assertEqual([], servers.value)
+            defaults = [value for key, value in node.value
+                        if key.value == 'defaults'][0]
+            self.assertNotEqual([], defaults.value)
+            self.assertEqual(
+                yaml.safe_load(CONFIG), loader.construct_document(node)
+            )
+        finally:
+            loader.dispose()
+
+
+class ConfigCompactTests(unittest.TestCase):
+    """Tests for Config with compact set."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        with open(os.path.join(self.tmpdir, 'config.yaml'), 'w') as conf:
+            conf.write(CONFIG)
+        self.env = mock.patch.dict(
+            os.environ, {'COMPACT_CONFIG_PATH': self.tmpdir}
+        )
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        shutil.rmtree(self.tmpdir)
+
+    def test_config(self):
+        """Test Config methods work with compact config"""
+        conf = CompactConfig()
+        self.assertIsInstance(conf.config, CompactMapping)
+        self.assertEqual('COMPACT', conf.prefix)
+        self.assertEqual('compact', conf.get('name'))
+        with mock.patch.dict(os.environ, {'COMPACT_NAME': 'env'}):
+            self.assertEqual('env', conf.get('name'))
+        self.assertEqual(yaml.safe_load(CONFIG), conf.config)
+        self.assertIn('servers', conf.keys())
+        self.assertEqual(len(conf.values()), len(conf.items()))
+
+    def test_deepcopy(self):
+        """Test deepcopy returns plain, mutable config"""
+        conf = CompactConfig()
+        new = deepcopy(conf)
+        self.assertIsInstance(new, dict)
+        self.assertEqual(new, conf.config)
+        new['foo'] = 'bar'
+        self.assertNotEqual(new, conf.config)
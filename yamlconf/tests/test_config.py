@@ -9,7 +9,10 @@ Tests for Config store
 
 # Imports from Standard Library
 import os
+import shutil
 import sys
+import tempfile
+import threading
 import unittest
 from copy import deepcopy
 
@@ -402,3 +405,62 @@ class ConfigTests(unittest.TestCase):
             self.assertEqual(
                 list(conf.values()), list(conf.config['test'].values())
             )
+
+
+class ConcurrencyTests(unittest.TestCase):
+    """Tests for reading config while it is reloaded."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.env = mock.patch.dict(os.environ, {
+            'TEST_CONFIG_PATH': self.tmpdir,
+            'ONE_ONLY': 'env',
+        })
+        self.env.start()
+        # every value in a file is the same, and only the prefix for
+        # file one has an environment variable set.
+        for name in ('one', 'two'):
+            keys = ["key{}: {}".format(num, name) for num in range(50)]
+            with open(os.path.join(self.tmpdir, name), 'w') as config_file:
+                config_file.write("config_prefix: {}\nonly: {}\n{}".format(
+                    name, name, "\n".join(keys)
+                ))
+
+    def tearDown(self):
+        self.env.stop()
+        shutil.rmtree(self.tmpdir)
+
+    def test_no_torn_reads(self):
+        """Test readers see a consistent config during reloads"""
+        conf = TESTConfig(config_file='one')
+        stop = threading.Event()
+        errors = []
+        reads = []
+
+        def read():
+            """Check every read comes from a single file."""
+            count = 0
+            while not stop.is_set():
+                for values in (conf.values(), deepcopy(conf).values()):
+                    if len(set(values)) != 1:
+                        errors.append(values)
+                # file one with prefix two would return 'one'
+                only = conf.get('only')
+                if only not in ('env', 'two'):
+                    errors.append(only)
+                count += 1
+            reads.append(count)
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for thread in readers:
+            thread.start()
+        for num in range(20):
+            conf.config_file = os.path.join(
+                self.tmpdir, ('one', 'two')[num % 2]
+            )
+            conf.load()
+        stop.set()
+        for thread in readers:
+            thread.join()
+        self.assertEqual([], errors)
+        self.assertTrue(all(reads))
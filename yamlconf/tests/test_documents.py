@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+copyright (c) 2016 Earth Advantage. All rights reserved.
+..codeauthor::Paul Munday <paul@paulmunday.net>
+
+Tests for multi-document YAML streams
+"""
+
+# Imports from Standard Library
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Imports from Third Party Modules
+import yaml
+
+# Local Imports
+from yamlconf import Config, ConfigError
+from yamlconf.documents import find_document, iter_documents
+
+PY3 = sys.version_info[0] == 3
+if PY3:
+    from unittest import mock
+else:
+    import mock
+
+
+# Constants
+STREAM = """# tenants
+%YAML 1.1
+---
+name: alpha
+config_prefix: ALPHA
+value: 1
+text: |
+    --- not a marker
+---
+name: "beta"  # quoted
+value: 2
+...
+# trailing comment
+---
+value: 3
+name: gamma
+"""
+
+
+# Helper Functions & Classes
+class DocumentConfig(Config):
+    """Config class for multi-document files"""
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, document=None):
+        super(DocumentConfig, self).__init__(
+            config_file='tenants.yaml', env_prefix='DOCUMENT_CONFIG',
+            document=document
+        )
+
+
+# Tests
+class DocumentTests(unittest.TestCase):
+    """Tests for locating documents."""
+
+    def parse(self, text):
+        """Parse each span"""
+        return [
+            yaml.safe_load(text[start:end])
+            for start, end in iter_documents(text)
+        ]
+
+    def test_iter_documents(self):
+        """Test spans match yaml.load_all"""
+        for text in [
+                STREAM,
+                "a: 1\n",
+                "a: 1\n---\nb: 2\n",
+                "---\na: 1\n...\n---\nb: 2\n...\n",
+                "--- {a: 1}\n--- [1, 2]\n",
+                "---\n---\na: 1\n",
+        ]:
+            self.assertEqual(list(yaml.safe_load_all(text)), self.parse(text))
+
+    def test_find_document(self):
+        """Test finding documents by key and position"""
+        for document, value in [
+                ('alpha', 1), ('beta', 2), ('gamma', 3), (0, 1), (2, 3)
+        ]:
+            start, end = find_document(STREAM, document)
+            self.assertEqual(
+                value, yaml.safe_load(STREAM[start:end])['value']
+            )
+        self.assertIsNone(find_document(STREAM, 'delta'))
+        self.assertIsNone(find_document(STREAM, 3))
+        start, end = find_document(STREAM, 2, key='value')
+        self.assertEqual('gamma', yaml.safe_load(STREAM[start:end])['name'])
+
+    def test_find_document_key_forms(self):
+        """Test documents are found however the key is written"""
+        text = (
+            "name: a\n"
+            "---\n\"name\": b\n"
+            "---\n'name' : c\n"
+            "---\nname:\n    d\n"
+            "---\nname: >-\n    e\n"
+            "---\n{name: f}\n"
+            "---\nvalue: 1\n"
+        )
+        for num, document in enumerate('abcdef'):
+            start, end = find_document(text, document)
+            self.assertEqual(
+                list(yaml.safe_load_all(text))[num],
+                yaml.safe_load(text[start:end])
+            )
+        self.assertIsNone(find_document(text, 'g'))
+
+    def test_find_document_lazy(self):
+        """Test later documents are not examined"""
+        with mock.patch(
+            'yamlconf.documents.document_key', return_value='alpha'
+        ) as mock_key:
+            find_document(STREAM, 'alpha')
+        self.assertEqual(1, mock_key.call_count)
+
+
+class ConfigDocumentTests(unittest.TestCase):
+    """Tests for loading a document from a multi-document file."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        with open(os.path.join(self.tmpdir, 'tenants.yaml'), 'w') as conf:
+            conf.write(STREAM)
+        self.env = mock.patch.dict(
+            os.environ, {'DOCUMENT_CONFIG_PATH': self.tmpdir}
+        )
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        shutil.rmtree(self.tmpdir)
+
+    def test_load_document(self):
+        """Test only the selected document is loaded"""
+        conf = DocumentConfig(document='beta')
+        self.assertEqual({'name': 'beta', 'value': 2}, conf.config)
+        conf = DocumentConfig(document=0)
+        self.assertEqual('ALPHA', conf.prefix)
+        with mock.patch.dict(os.environ, {'ALPHA_VALUE': 'env'}):
+            self.assertEqual('env', conf.get('value'))
+
+    def test_load_document_missing(self):
+        """Test error raised if document not found"""
+        with self.assertRaises(ConfigError) as conm:
+            DocumentConfig(document='delta')
+        self.assertEqual(
+            "Could not find document 'delta' (name) in file: {}".format(
+                os.path.join(self.tmpdir, 'tenants.yaml')
+            ),
+            str(conm.exception)
+        )
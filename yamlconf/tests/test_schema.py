@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+copyright (c) 2016 Earth Advantage. All rights reserved.
+..codeauthor::Paul Munday <paul@paulmunday.net>
+
+Tests for Config schemas
+"""
+
+# Imports from Standard Library
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Local Imports
+from yamlconf import Config, ConfigError, Field, Schema
+from yamlconf.sources import Source
+
+PY3 = sys.version_info[0] == 3
+if PY3:
+    from unittest import mock
+else:
+    import mock
+
+
+# Constants
+SCHEMA = Schema({
+    'database': {
+        'host': str,
+        'port': Field(int, min_value=1, max_value=65535),
+        'engine': Field(str, required=False, choices=['postgres', 'sqlite']),
+        'options': {
+            'timeout': Field((int, float), required=False, min_value=0),
+        },
+    },
+    'debug': Field(bool, required=False),
+    'name': str,
+})
+VALID = """
+config_prefix: SCHEMA
+name: test
+database:
+    host: localhost
+    port: 5432
+"""
+
+
+# Helper Functions & Classes
+class SchemaConfig(Config):
+    """Config class with schema"""
+    # pylint: disable=too-few-public-methods
+    schema = SCHEMA
+
+    def __init__(self, config_file=None, source=None):
+        super(SchemaConfig, self).__init__(
+            config_file=config_file, env_prefix='SCHEMA_CONFIG',
+            source=source
+        )
+
+
+class StaticSource(Source):
+    """Source whose config never changes"""
+
+    def __init__(self, text):
+        self.text = text
+
+    def fetch(self, version=None):
+        """Return config, or None if version is current"""
+        return (None if version == 1 else self.text), 1
+
+
+# Tests
+class SchemaTests(unittest.TestCase):
+    """Tests for compiled schemas."""
+
+    def validate(self, config, env=None):
+        """Validate config, return errors"""
+        env = env or {}
+        with mock.patch.dict(os.environ, env):
+            errors = SCHEMA.validate(config, SCHEMA.env_names(
+                lambda var, section: '_'.join(filter(None, [section, var]))
+            ))
+        return errors
+
+    def test_valid(self):
+        """Test valid config has no errors"""
+        config = {
+            'name': 'test',
+            'debug': False,
+            'database': {
+                'host': 'localhost', 'port': 5432, 'engine': 'sqlite',
+                'options': {'timeout': 1.5}
+            },
+        }
+        self.assertEqual([], self.validate(config))
+
+    def test_all_errors_reported(self):
+        """Test all violations are reported"""
+        config = {
+            'debug': 'yes',
+            'database': {
+                'port': 0, 'engine': 'mysql', 'options': {'timeout': -1}
+            },
+        }
+        expected = [
+            "database.host: required value is missing",
+            "database.port: 0 is less than 1",
+            "database.engine: 'mysql' is not one of ('postgres', 'sqlite')",
+            "database.options.timeout: -1 is less than 0",
+            "debug: expected bool, got str",
+            "name: required value is missing",
+        ]
+        self.assertEqual(sorted(expected), sorted(self.validate(config)))
+
+    def test_types(self):
+        """Test type checks"""
+        config = {
+            'name': 'test',
+            'database': {'host': 'localhost', 'port': True, 'options': []},
+        }
+        expected = [
+            "database.options: expected a mapping, got list",
+            "database.port: expected int, got bool",
+        ]
+        self.assertEqual(expected, sorted(self.validate(config)))
+
+    def test_env_overrides(self):
+        """Test environment overrides are validated"""
+        config = {'database': {'port': 5432}}
+        env = {
+            'name': 'test',
+            'database_host': 'localhost',
+            'database_port': '100000',
+        }
+        expected = [
+            "database.port (environment): 100000 is greater than 65535",
+        ]
+        self.assertEqual(expected, self.validate(config, env))
+        env['database_port'] = 'eighty'
+        expected = [
+            "database.port (environment): 'eighty' is not a valid int",
+        ]
+        self.assertEqual(expected, self.validate(config, env))
+        env['database_port'] = '80'
+        env['debug'] = 'true'
+        self.assertEqual([], self.validate(config, env))
+
+    def test_bounds_without_types(self):
+        """Test values that can not be compared with bounds are reported"""
+        schema = Schema({'workers': Field(min_value=1, max_value=8)})
+        env_names = schema.env_names(lambda var, section: var.upper())
+        self.assertEqual([], schema.validate({'workers': 4}, env_names))
+        self.assertEqual(
+            ["workers: 'four' can not be compared with 1"],
+            schema.validate({'workers': 'four'}, env_names)
+        )
+        with mock.patch.dict(os.environ, {'WORKERS': '4'}):
+            errors = schema.validate({'workers': 4}, env_names)
+        self.assertEqual(
+            ["workers (environment): '4' can not be compared with 1"], errors
+        )
+
+    def test_env_containers(self):
+        """Test containers can not be set from the environment"""
+        schema = Schema({'hosts': Field(list, required=False)})
+        env_names = schema.env_names(lambda var, section: var.upper())
+        with mock.patch.dict(os.environ, {'HOSTS': 'not a list'}):
+            errors = schema.validate({}, env_names)
+        self.assertEqual(
+            ["hosts (environment): list can not be set from the environment"],
+            errors
+        )
+
+
+class ConfigSchemaTests(unittest.TestCase):
+    """Tests for validation on load."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.tmpdir, 'config.yaml')
+        self.env = mock.patch.dict(
+            os.environ, {'SCHEMA_CONFIG_PATH': self.tmpdir}
+        )
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, text):
+        """Write config file"""
+        with open(self.config_file, 'w') as config_file:
+            config_file.write(text)
+
+    def test_load(self):
+        """Test valid config loads"""
+        self.write(VALID)
+        conf = SchemaConfig()
+        self.assertEqual(5432, conf.get('port', section='database'))
+
+    def test_load_invalid(self):
+        """Test invalid config raises error listing violations"""
+        self.write("database:\n    port: 0\n")
+        with self.assertRaises(ConfigError) as conm:
+            SchemaConfig()
+        msg = str(conm.exception)
+        self.assertIn(self.config_file, msg)
+        self.assertIn("database.host: required value is missing", msg)
+        self.assertIn("database.port: 0 is less than 1", msg)
+        self.assertIn("name: required value is missing", msg)
+
+    def test_reload_invalid_keeps_config(self):
+        """Test failed reload retains existing config"""
+        self.write(VALID)
+        conf = SchemaConfig()
+        self.write(VALID.replace('5432', '-1'))
+        with self.assertRaises(ConfigError):
+            conf.load()
+        self.assertEqual(5432, conf.get('port', section='database'))
+
+    def test_load_env_override(self):
+        """Test environment overrides are validated on load"""
+        self.write(VALID)
+        with mock.patch.dict(os.environ, {'SCHEMA_DATABASE_PORT': 'x'}):
+            with self.assertRaises(ConfigError) as conm:
+                SchemaConfig()
+        self.assertIn(
+            "database.port (environment): 'x' is not a valid int",
+            str(conm.exception)
+        )
+
+    def test_reload_unchanged(self):
+        """Test config is only validated again on reload if the source or
+        environment overrides changed"""
+        conf = SchemaConfig(source=StaticSource(VALID))
+        with mock.patch.object(
+            SCHEMA, 'validate', wraps=SCHEMA.validate
+        ) as mock_validate:
+            conf.load()
+            self.assertFalse(mock_validate.called)
+            with mock.patch.dict(os.environ, {'SCHEMA_DEBUG': 'maybe'}):
+                with self.assertRaises(ConfigError):
+                    conf.load()
+            self.assertTrue(mock_validate.called)
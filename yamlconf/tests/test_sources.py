@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+copyright (c) 2016 Earth Advantage. All rights reserved.
+..codeauthor::Paul Munday <paul@paulmunday.net>
+
+Tests for config sources
+"""
+
+# Imports from Standard Library
+import errno
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+# Imports from Third Party Modules
+import yaml
+
+# Local Imports
+from yamlconf import Config, ConfigError
+from yamlconf.sources import ConnectionPool, HTTPSource
+
+PY3 = sys.version_info[0] == 3
+if PY3:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from unittest import mock
+else:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    import mock
+
+
+# Constants
+CONFIG = """
+config_prefix: HTTP
+name: remote
+section:
+    key: value
+"""
+
+
+# Helper Functions & Classes
+class ConfigServer(ThreadingMixIn, HTTPServer):
+    """Stand in config service."""
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        """Ignore clients that went away (e.g. timed out)."""
+        pass
+
+
+class ConfigHandler(BaseHTTPRequestHandler):
+    """Serve server.config with ETag support."""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):   # noqa pylint: disable=invalid-name
+        """Handle GET."""
+        server = self.server
+        server.requests.append((self.client_address, self.path))
+        time.sleep(server.delay)
+        etag = '"{}"'.format(server.version)
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = server.config.encode('utf-8')
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Type', 'application/yaml; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):   # pylint: disable=arguments-differ
+        """Silence logging."""
+        pass
+
+
+class HTTPConfig(Config):
+    """Config class for HTTP sources"""
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, source, section=None):
+        super(HTTPConfig, self).__init__(
+            env_prefix='HTTP_CONFIG', section=section, source=source
+        )
+
+
+# Tests
+class HTTPSourceTests(unittest.TestCase):
+    """Tests for HTTPSource."""
+
+    def setUp(self):
+        self.server = ConfigServer(('127.0.0.1', 0), ConfigHandler)
+        self.server.config = CONFIG
+        self.server.version = 1
+        self.server.delay = 0
+        self.server.requests = []
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.url = 'http://127.0.0.1:{}/config.yaml'.format(
+            self.server.server_address[1]
+        )
+        self.pool = ConnectionPool()
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.stop_server()
+        shutil.rmtree(self.tmpdir)
+
+    def stop_server(self):
+        """Shut down server"""
+        # close kept alive connections so they are not served
+        self.pool.clear()
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.thread.join()
+            self.server = None
+
+    def test_load(self):
+        """Test config loaded from URL"""
+        conf = HTTPConfig(HTTPSource(self.url, pool=self.pool))
+        self.assertEqual('remote', conf.get('name'))
+        self.assertEqual('value', conf.get('key', section='section'))
+        with mock.patch.dict(os.environ, {'HTTP_SECTION_KEY': 'env'}):
+            self.assertEqual('env', conf.get('key', section='section'))
+
+    def test_conditional_reload(self):
+        """Test unchanged config is neither transferred nor parsed"""
+        conf = HTTPConfig(HTTPSource(self.url, pool=self.pool))
+        config = conf.config
+        with mock.patch('yamlconf.config.yaml.load') as mock_load:
+            conf.load()
+        self.assertFalse(mock_load.called)
+        self.assertIs(config, conf.config)
+        self.server.config = CONFIG.replace('remote', 'changed')
+        self.server.version = 2
+        conf.load()
+        self.assertEqual('changed', conf.get('name'))
+
+    def test_connection_reuse(self):
+        """Test connections are kept open and reused"""
+        conf = HTTPConfig(HTTPSource(self.url, pool=self.pool))
+        for _ in range(3):
+            conf.load()
+        clients = set(client for client, _ in self.server.requests)
+        self.assertEqual(4, len(self.server.requests))
+        self.assertEqual(1, len(clients))
+
+    def test_stale_connections(self):
+        """Test a dropped connection is retried with a new connection"""
+        # pylint: disable=protected-access
+        source = HTTPSource(self.url, pool=self.pool)
+        stale = []
+        for _ in range(2):
+            conn = mock.Mock()
+            conn.request.side_effect = socket.error(
+                errno.ECONNRESET, 'Connection reset by peer'
+            )
+            stale.append(conn)
+            self.pool.put('http', source._netloc, conn)
+        conf = HTTPConfig(source)
+        self.assertEqual('remote', conf.get('name'))
+        self.assertEqual(1, len(self.server.requests))
+        self.assertEqual(1, sum(conn.request.call_count for conn in stale))
+
+    def test_fallback(self):
+        """Test last good copy is used if server is unavailable"""
+        cache_file = os.path.join(self.tmpdir, 'cache.yaml')
+        conf = HTTPConfig(
+            HTTPSource(self.url, pool=self.pool, cache_file=cache_file)
+        )
+        self.stop_server()
+        conf.load()
+        self.assertEqual('remote', conf.get('name'))
+        # new source falls back to cache file
+        conf = HTTPConfig(HTTPSource(
+            self.url, pool=ConnectionPool(), cache_file=cache_file,
+            timeout=1
+        ))
+        self.assertEqual('remote', conf.get('name'))
+
+    def test_unavailable(self):
+        """Test error raised if server unavailable and no copy"""
+        self.stop_server()
+        with self.assertRaises(ConfigError) as conm:
+            HTTPConfig(HTTPSource(self.url, pool=self.pool, timeout=1))
+        self.assertIn(
+            "Could not fetch config from {}".format(self.url),
+            str(conm.exception)
+        )
+
+    def test_error_status(self):
+        """Test error status falls back to last good copy"""
+        conf = HTTPConfig(HTTPSource(self.url, pool=self.pool))
+        with mock.patch.object(
+            HTTPSource, '_request', return_value=(500, None, 'error')
+        ):
+            conf.load()
+        self.assertEqual('remote', conf.get('name'))
+
+    def test_invalid_not_kept(self):
+        """Test config that fails to load is not used as last good copy"""
+        cache_file = os.path.join(self.tmpdir, 'cache.yaml')
+        conf = HTTPConfig(
+            HTTPSource(self.url, pool=self.pool, cache_file=cache_file)
+        )
+        self.server.config = 'name: [invalid'
+        self.server.version = 2
+        with self.assertRaises(yaml.YAMLError):
+            conf.load()
+        self.assertEqual('remote', conf.get('name'))
+        with open(cache_file) as cached:
+            self.assertEqual(CONFIG, cached.read())
+        self.stop_server()
+        conf.load()
+        self.assertEqual('remote', conf.get('name'))
+
+    def test_timeout(self):
+        """Test timeout is honoured and slow requests are not retried"""
+        source = HTTPSource(self.url, pool=self.pool, timeout=0.2)
+        conf = HTTPConfig(source)
+        self.server.delay = 1
+        start = time.time()
+        conf.load()
+        self.assertLess(time.time() - start, 0.6)
+        self.assertEqual(2, len(self.server.requests))
+        self.assertEqual('remote', conf.get('name'))